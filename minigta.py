@@ -1,6 +1,6 @@
 # gta_full_v5.py - Mini GTA completo (Pygame)
 # NOVEDADES: Estilo visual Retro (GTA 2) (v7)
-# Requisitos: Python 3.8+, pygame
+# Requisitos: Python 3.8+, pygame-ce (o pygame)
 
 import pygame
 import os
@@ -8,20 +8,33 @@ import sys
 import math
 import random
 import json
-import time
 from pathlib import Path
-from collections import deque
+from collections import deque, defaultdict
+
+# Enlaces a nivel de módulo para el código caliente (evitan un LOAD_ATTR por llamada)
+_cos, _sin, _atan2, _sqrt = math.cos, math.sin, math.atan2, math.sqrt
+_Rect = pygame.Rect
+
+# orjson (opcional) para guardar/cargar partidas más rápido; mismo formato JSON
+try:
+    import orjson
+    def json_dumps(obj): return orjson.dumps(obj)
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj): return json.dumps(obj).encode("utf-8")
+    json_loads = json.loads
 
 # ------------------ Inicialización segura ------------------
 pygame.init()
+# NotImplementedError: builds de pygame sin SDL_ttf/SDL_mixer (el módulo es un MissingModule)
 try:
     pygame.font.init()
-except:
+except (pygame.error, NotImplementedError):
     pass
 try:
     pygame.mixer.init()
-except:
-    pass
+except (pygame.error, NotImplementedError):
+    pass # Sin dispositivo de audio: safe_load_sound devolverá None
 
 # ------------------ Rutas y carga segura ------------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -42,7 +55,8 @@ def safe_load_image(name, size=None, fallback_color=(255,255,255)):
     if size is None: size = (40,40)
     surf = pygame.Surface(size, pygame.SRCALPHA)
     surf.fill(fallback_color)
-    return surf
+    # Mismo formato de píxel que la pantalla (si ya existe) para blits sin conversión
+    return surf.convert_alpha() if pygame.display.get_surface() else surf
 
 def safe_load_sound(name):
     path = os.path.join(ASSETS_DIR, name)
@@ -55,15 +69,50 @@ def safe_load_sound(name):
 
 # ------------------ Configuración de ventana / mapa ------------------
 WIDTH, HEIGHT = 1280, 720
-SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
+# pygame-ce: escalado por GPU + doble buffer y vsync. Con pygame clásico se usa el modo simple.
+if getattr(pygame, "IS_CE", False):
+    DISPLAY_FLAGS = pygame.SCALED | pygame.DOUBLEBUF | pygame.HWSURFACE
+    try:
+        SCREEN = pygame.display.set_mode((WIDTH, HEIGHT), DISPLAY_FLAGS, vsync=1)
+    except pygame.error:
+        SCREEN = pygame.display.set_mode((WIDTH, HEIGHT), DISPLAY_FLAGS)
+else:
+    SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Mini GTA — Full V7 (Estilo GTA 2)")
 CLOCK = pygame.time.Clock()
 # FONT para un aspecto más grueso y legible
 FONT = pygame.font.SysFont("Courier New", 20, bold=True)
 BIG = pygame.font.SysFont("Courier New", 28, bold=True)
 
+# Cache de textos renderizados: Font.render es caro y el HUD repite casi siempre las mismas cadenas
+TEXT_CACHE = {}
+TEXT_CACHE_MAX = 256
+
+def render_text(font, txt, color):
+    key = (font, txt, color)
+    surf = TEXT_CACHE.get(key)
+    if surf is None:
+        if len(TEXT_CACHE) >= TEXT_CACHE_MAX:
+            # Se descarta solo la entrada más antigua (orden de inserción del dict),
+            # así los rótulos fijos del HUD no se re-renderizan todos de golpe
+            del TEXT_CACHE[next(iter(TEXT_CACHE))]
+        surf = font.render(txt, True, color).convert_alpha()
+        TEXT_CACHE[key] = surf
+    return surf
+
 MAP_W, MAP_H = 4000, 3000 
 CITY_BLOCK_SIZE = 500 
+# Margen de culling: mitad del sprite más grande (explosión escalada x3)
+CULL_MARGIN = 100
+# Celdas de 128 px (x >> 7) para el hash espacial de vehículos / NPCs
+GRID_SHIFT = 7
+# Celdas de 256 px para la rejilla estática de edificios
+BUILDING_CELL = 256
+# Trozos de 512 px de la capa estática del mundo (se renderizan bajo demanda)
+CHUNK_SIZE = 512
+# Lado del minimapa en píxeles
+MINIMAP_SIZE = 180
+MINIMAP_RATIO = MINIMAP_SIZE / MAP_W # escala mundo -> minimapa
 
 # ------------------ Sprites / sonidos (opcionales) ------------------
 # Colores predeterminados para fallback (más oscuros para el nuevo estilo)
@@ -73,6 +122,43 @@ POLICE_IMG = safe_load_image("police.png", (72,44), (180,60,60)) # Rojo ladrillo
 BULLET_IMG = safe_load_image("bullet.png", (8,8), (255,160,0)) # Naranja brillante
 EXPLOSION_IMG = safe_load_image("explosion.png", (64,64), (255,165,0))
 
+# Atlas de sprites pre-rotados: (superficie, media anchura, media altura) por paso angular
+ROT_STEPS = 64
+ROT_MASK = ROT_STEPS - 1
+ROT_SCALE = ROT_STEPS / (2 * math.pi)
+
+def build_rotations(img):
+    frames = []
+    for i in range(ROT_STEPS):
+        rotated = pygame.transform.rotate(img, -i * 360 / ROT_STEPS).convert_alpha()
+        frames.append((rotated, rotated.get_width() / 2, rotated.get_height() / 2))
+    return frames
+
+def rot_index(angle):
+    return int((angle * ROT_SCALE) % ROT_STEPS + 0.5) & ROT_MASK
+
+PLAYER_ROT = build_rotations(PLAYER_IMG)
+CAR_ROT = build_rotations(CAR_IMG)
+POLICE_ROT = build_rotations(POLICE_IMG)
+
+# Fotogramas de coche dañado (tinte rojo) compartidos entre vehículos y generados bajo demanda.
+# Clave con el alfa exacto (como antes de la cache): acotada a 2 imágenes x 100 alfas x ROT_STEPS
+DAMAGED_ROT = {}
+
+def damaged_frame(img, tint_size, health, idx):
+    # tint_size: zona tintada (la caja del vehículo), anclada arriba a la izquierda
+    alpha = int(max(0, min(200 - health * 2, 200)))
+    key = (img, alpha, idx)
+    frame = DAMAGED_ROT.get(key)
+    if frame is None:
+        tinted = img.copy()
+        damage_surf = pygame.Surface(tint_size, pygame.SRCALPHA)
+        damage_surf.fill((255, 0, 0, alpha))
+        tinted.blit(damage_surf, (0, 0))
+        rotated = pygame.transform.rotate(tinted, -idx * 360 / ROT_STEPS).convert_alpha()
+        frame = DAMAGED_ROT[key] = (rotated, rotated.get_width() / 2, rotated.get_height() / 2)
+    return frame
+
 SND_SHOOT = safe_load_sound("shoot.wav")
 SND_RELOAD = safe_load_sound("reload.wav") 
 SND_ENTER = safe_load_sound("enter.wav")
@@ -95,6 +181,39 @@ HUD_MONEY_COLOR = (50, 255, 50) # Verde brillante
 WINDOW_LIGHT = (255, 230, 150) # Luz cálida para ventanas
 POLICE_COLOR = (200, 50, 50) # Color uniforme para policía
 
+# Sprites planos pre-renderizados (se dibujan en lote con Surface.blits)
+NPC_IMG = pygame.Surface((14, 18)).convert()
+NPC_IMG.fill((255, 255, 50)) # Peatones amarillos neón
+NPC_POLICE_IMG = pygame.Surface((14, 18)).convert()
+NPC_POLICE_IMG.fill(POLICE_COLOR)
+
+# Barras de vida de la policía a pie (14 px de ancho): una superficie por ancho de la parte verde
+def _build_health_bars(w=14):
+    bars = []
+    for bar_w in range(w + 1):
+        bar = pygame.Surface((w, 3)).convert()
+        bar.fill((200, 50, 50))
+        bar.fill((50, 200, 50), (0, 0, bar_w, 3))
+        bars.append(bar)
+    return bars
+HEALTH_BAR_IMGS = _build_health_bars()
+
+# Marcadores del minimapa pre-renderizados: NPC (círculo r=2) y coche (cuadro 4x4), volcados con un único blits
+def _minimap_dot(color):
+    dot = pygame.Surface((5, 5), pygame.SRCALPHA)
+    pygame.draw.circle(dot, color, (2, 2), 2)
+    return dot.convert_alpha()
+
+def _minimap_square(color):
+    sq = pygame.Surface((4, 4)).convert()
+    sq.fill(color)
+    return sq
+MINI_NPC_DOT = _minimap_dot(HUD_TEXT_COLOR)
+MINI_POLICE_DOT = _minimap_dot(HUD_WANTED_COLOR)
+MINI_CAR_IMG = _minimap_square((255, 50, 50))
+MINI_POLICE_CAR_IMG = _minimap_square((0, 0, 255))
+MINI_PLAYER_CAR_IMG = _minimap_square(HUD_MONEY_COLOR)
+
 # Paleta de colores de edificios variados 
 BUILDING_PALETTE = [
     (50, 50, 50),      # Gris oscuro (Hormigón)
@@ -104,39 +223,181 @@ BUILDING_PALETTE = [
     (160, 160, 160)    # Blanco sucio
 ]
 
+def building_shades(color):
+    # (sombra, borde iluminado) de un color de edificio
+    return (tuple(max(0, c - 20) for c in color), tuple(min(255, c + 20) for c in color))
+# Tonos derivados de la paleta, calculados una vez en lugar de por edificio
+BUILDING_SHADES = {c: building_shades(c) for c in BUILDING_PALETTE}
+
 # Gameplay params
 NUM_CARS = 60
 NUM_NPCS = 120
 NUM_POLICE_PEOPLE = 25
 NUM_POLICE_CARS = 12
 MAX_WANTED = 5
+AI_BUCKETS = 4 # La IA policial recalcula el rumbo 1 de cada AI_BUCKETS frames
+# LOD: fuera de esta caja (1.5x la vista, centrada en el jugador) los agentes ociosos
+# solo se actualizan en el frame de su bucket
+ACTIVE_HALF_W, ACTIVE_HALF_H = WIDTH * 3 // 4, HEIGHT * 3 // 4
+# ... y a más de FREEZE_DIST (en x o en y) quedan congelados hasta que el jugador se acerque
+FREEZE_DIST = 2000
+BULLET_POOL_SIZE = 512 # Balas preasignadas que se reciclan en vez de crear objetos nuevos
+BULLET_MAX_SPEED = 18 # px por frame de la bala más rápida (pistola); margen de las rejillas de impacto
+# Oscuridad nocturna (alpha 0-179) por 1/30 de hora (18h-24h: sube; 0h-6h: baja a 0). La rampa
+# cambia 30 por hora, así que la tabla coincide con int(180*(t-18)/6) / int(180*(6-t)/6) salvo en
+# los instantes exactos múltiplos de 1/30 h, donde puede diferir en 1 (por la mañana la fórmula
+# da un valor más justo en ese instante; en ambas ramas también influye el redondeo en coma flotante)
+DARKNESS_STEPS = 30
+DARKNESS_LUT = tuple(i - 18 * DARKNESS_STEPS if i >= 18 * DARKNESS_STEPS else max(0, 6 * DARKNESS_STEPS - 1 - i)
+                     for i in range(24 * DARKNESS_STEPS))
 
 # Definición de armas con capacidades de munición máxima y cargador
 WEAPONS_DATA = {
-    0: {"name": "PISTOL", "mag_size": 15, "max_ammo": 150, "damage": 35, "cooldown": 0.18},
-    1: {"name": "SHOTGUN", "mag_size": 6, "max_ammo": 30, "damage": 18, "cooldown": 0.9}
+    0: {"name": "PISTOL", "mag_size": 15, "max_ammo": 150, "damage": 35, "cooldown_ms": 180},
+    1: {"name": "SHOTGUN", "mag_size": 6, "max_ammo": 30, "damage": 18, "cooldown_ms": 900}
+}
+
+# Rótulos fijos del HUD renderizados una sola vez: fuera de TEXT_CACHE para que nunca se expulsen
+HUD_LABELS = {
+    "ARMOR": BIG.render("ARMOR", True, HUD_TEXT_COLOR).convert_alpha(),
+    "RELOADING": BIG.render("RELOADING", True, (255, 100, 0)).convert_alpha(),
 }
+WEAPON_LABELS = {n: BIG.render(d["name"], True, HUD_TEXT_COLOR).convert_alpha() for n, d in WEAPONS_DATA.items()}
+WANTED_LABELS = [BIG.render("WANTED LEVEL: " + "*" * i, True, HUD_WANTED_COLOR).convert_alpha()
+                 for i in range(MAX_WANTED + 1)]
 
 # ------------------ Utilidades ------------------
 def clamp(v,a,b): return max(a, min(v, b))
-def distance(a,b): return math.hypot(a[0]-b[0], a[1]-b[1])
+def dist2(ax,ay,bx,by):
+    # Distancia al cuadrado: para comparar contra un umbral sin sqrt ni tuplas intermedias
+    dx=ax-bx; dy=ay-by
+    return dx*dx+dy*dy
+
+def build_hit_grid(entities, radius):
+    # Cada entidad entra en todas las celdas que toca su caja de impacto (±radius),
+    # así un punto (una bala) solo necesita consultar su propia celda
+    grid = defaultdict(list)
+    for e in entities:
+        x0 = int(e.x - radius) >> GRID_SHIFT; x1 = int(e.x + radius) >> GRID_SHIFT
+        y0 = int(e.y - radius) >> GRID_SHIFT; y1 = int(e.y + radius) >> GRID_SHIFT
+        for gx in range(x0, x1 + 1):
+            for gy in range(y0, y1 + 1):
+                grid[(gx, gy)].append(e)
+    return grid
+
+def segment_hits_box(x0, y0, x1, y1, cx, cy, r):
+    # ¿Toca el tramo recorrido por una bala este frame, (x0,y0)-(x1,y1), la caja ±r centrada en (cx,cy)?
+    # Prueba barrida: una bala rápida no atraviesa la esquina de un blanco entre dos frames
+    if abs(x1 - cx) < r and abs(y1 - cy) < r:
+        return True # caso habitual: la bala termina dentro
+    if (min(x0, x1) >= cx + r or max(x0, x1) <= cx - r
+            or min(y0, y1) >= cy + r or max(y0, y1) <= cy - r):
+        return False
+    return bool(_Rect(cx - r, cy - r, 2 * r, 2 * r).clipline(x0, y0, x1, y1))
+
+# Direcciones normalizadas por máscara de teclas (bit0=arriba, bit1=abajo, bit2=izq, bit3=der)
+# Tupla indexada por la máscara; en diagonal el factor es 1/sqrt(2), sin hypot
+DIAGONAL = 0.7071067811865476
+
+def _build_dirs():
+    dirs = []
+    for mask in range(16):
+        dx = ((mask >> 3) & 1) - ((mask >> 2) & 1)
+        dy = ((mask >> 1) & 1) - (mask & 1)
+        f = DIAGONAL if dx and dy else 1.0
+        dirs.append((dx * f, dy * f))
+    return tuple(dirs)
+DIRS = _build_dirs()
+
+# Teclas de movimiento (principal, alternativa) resueltas una sola vez
+MOVE_UP = (pygame.K_w, pygame.K_UP)
+MOVE_DOWN = (pygame.K_s, pygame.K_DOWN)
+MOVE_LEFT = (pygame.K_a, pygame.K_LEFT)
+MOVE_RIGHT = (pygame.K_d, pygame.K_RIGHT)
+
+# Bits de la máscara de movimiento
+UP_BIT, DOWN_BIT, LEFT_BIT, RIGHT_BIT = 1, 2, 4, 8
+
+def movement_mask(keys, up=MOVE_UP, down=MOVE_DOWN, left=MOVE_LEFT, right=MOVE_RIGHT):
+    # Máscara de 4 bits compatible con DIRS
+    return ((keys[up[0]] or keys[up[1]])
+            | (keys[down[0]] or keys[down[1]]) << 1
+            | (keys[left[0]] or keys[left[1]]) << 2
+            | (keys[right[0]] or keys[right[1]]) << 3)
+
+# Tabla de cos/sin cuantizada a 1024 pasos (~0.35°), suficiente para mover entidades
+TRIG_STEPS = 1024
+TRIG_MASK = TRIG_STEPS - 1
+TRIG_SCALE = TRIG_STEPS / (2 * math.pi)
+COS_LUT = [math.cos(i / TRIG_SCALE) for i in range(TRIG_STEPS)]
+SIN_LUT = [math.sin(i / TRIG_SCALE) for i in range(TRIG_STEPS)]
 
 # ------------------ Cámara ------------------
 class Camera:
     def __init__(self,w,h):
         self.x = 0; self.y = 0; self.w=w; self.h=h
-    def update(self, target):
-        if hasattr(target,'x') and hasattr(target,'y'):
-            tx,ty = target.x, target.y
-        else:
-            tx,ty = target
-        self.x = int(clamp(tx - WIDTH//2, 0, MAP_W - WIDTH))
-        self.y = int(clamp(ty - HEIGHT//2, 0, MAP_H - HEIGHT))
+    def update_entity(self, e):
+        self.x = int(max(0, min(e.x - WIDTH//2, MAP_W - WIDTH)))
+        self.y = int(max(0, min(e.y - HEIGHT//2, MAP_H - HEIGHT)))
+    def update_point(self, p):
+        self.x = int(max(0, min(p[0] - WIDTH//2, MAP_W - WIDTH)))
+        self.y = int(max(0, min(p[1] - HEIGHT//2, MAP_H - HEIGHT)))
     def to_screen(self, pos):
         return pos[0]-self.x, pos[1]-self.y
 
 camera = Camera(WIDTH, HEIGHT)
 
+# Profundidad de la sombra (efecto 3D) de los edificios
+BUILDING_SHADOW = 4
+
+def render_building(w, h, color, b_type):
+    # Edificio (Estructuras Variadas con Efecto 3D) pre-renderizado una vez en su propia superficie
+    surf = pygame.Surface((w + BUILDING_SHADOW, h + BUILDING_SHADOW), pygame.SRCALPHA)
+    darker_color, lighter_color = BUILDING_SHADES.get(color) or building_shades(color)
+
+    # 1. Dibujar la Sombra (efecto 3D)
+    pygame.draw.rect(surf, darker_color, (BUILDING_SHADOW, BUILDING_SHADOW, w, h))
+
+    # 2. Dibujar el Cuerpo Principal
+    pygame.draw.rect(surf, color, (0, 0, w, h))
+
+    # 3. Detalle de Fachada/Ventanas
+    window_color = WINDOW_LIGHT
+
+    if b_type == 'office':
+        # Patrón de rejilla (ventanas de oficina)
+        window_size = 6; gap = 6
+        for wx in range(gap, w - gap, window_size + gap):
+            for wy in range(gap, h - gap, window_size + gap):
+                pygame.draw.rect(surf, window_color, (wx, wy, window_size, window_size))
+
+    elif b_type == 'shop':
+        # Fachada de tienda (una ventana grande)
+        pygame.draw.rect(surf, (150, 20, 20), (0, 0, w, 8)) # Toldo/Techo rojo
+        pygame.draw.rect(surf, (50, 50, 50), (5, 10, w - 10, h - 15)) # Ventana (oscura)
+
+    else: # residence
+        # Patrón de ventanas pequeño y espaciado (residencial)
+        window_size = 4; gap = 12
+        for wx in range(gap, w - gap, window_size + gap):
+            for wy in range(gap, h - gap, window_size + gap):
+                pygame.draw.rect(surf, window_color, (wx, wy, window_size, window_size))
+
+    # 4. Borde superior para efecto de luz
+    pygame.draw.rect(surf, lighter_color, (0, 0, w, 1))
+    pygame.draw.rect(surf, lighter_color, (0, 0, 1, h))
+
+    # 5. Borde negro final
+    pygame.draw.rect(surf, BLACK, (0, 0, w, h), 1)
+    return surf.convert_alpha()
+
+# Marcas viales (naranja retro) pre-renderizadas, una cada LANE_STEP px en coordenadas de mundo
+LANE_STEP = 60
+LANE_H_IMG = pygame.Surface((30, 4)).convert()
+LANE_H_IMG.fill((255, 160, 0))
+LANE_V_IMG = pygame.Surface((4, 30)).convert()
+LANE_V_IMG.fill((255, 160, 0))
+
 # ------------------ Mundo (roads + buildings con hitboxes) ------------------
 class World:
     def __init__(self):
@@ -144,6 +405,10 @@ class World:
         self.buildings = []
         self.pavements = [] 
         self.generate_city_grid()
+        self.bgrid = self.build_building_grid()
+        self.chunks = {} # (cx, cy) -> superficie CHUNK_SIZE x CHUNK_SIZE ya renderizada
+        self.chunk_buildings = self.build_chunk_index()
+        self.mini_bg = self.render_minimap_bg(MINIMAP_SIZE)
 
     def generate_city_grid(self):
         road_width = 100
@@ -207,7 +472,8 @@ class World:
                         if bw >= 20 and bh >= 20: 
                             rect = pygame.Rect(current_x, current_y, bw, bh)
                             color = random.choice(BUILDING_PALETTE)
-                            self.buildings.append({'rect': rect, 'color': color, 'type': b_type})
+                            self.buildings.append({'rect': rect, 'color': color, 'type': b_type,
+                                                   'img': render_building(bw, bh, color, b_type)})
                             current_x += bw + building_margin
                         else:
                             break 
@@ -216,91 +482,108 @@ class World:
                     if current_y > max_y and current_y < max_y + 40: 
                         current_y = max_y
 
-    def draw(self, surf, cam):
+    def render_chunk(self, cx, cy):
+        # Trozo de la capa estática (pasto, carreteras, aceras, edificios) renderizado una sola vez
+        area = pygame.Rect(cx * CHUNK_SIZE, cy * CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE)
+        ox, oy = area.x, area.y
+        surf = pygame.Surface((CHUNK_SIZE, CHUNK_SIZE)).convert()
         surf.fill(GRASS)
         
         # 1. Draw Roads
         for r in self.roads:
-            sx,sy = cam.to_screen((r.x, r.y))
-            pygame.draw.rect(surf, ROAD, (sx, sy, r.w, r.h))
+            if not area.colliderect(r): continue
+            pygame.draw.rect(surf, ROAD, r.move(-ox, -oy))
             
-            # Detalle de Carreteras (líneas amarillas)
+            # Detalle de Carreteras: solo las marcas que caen en este trozo, en un único blits
             if r.w > r.h: # Horizontal
-                center_y = sy + r.h / 2
-                # Dibuja la línea central discontinua
-                start_x = (cam.x % 60) - 60 
-                for i in range(int(WIDTH / 60) + 2):
-                    line_x = 0 + i * 60 - start_x
-                    if sx < line_x < sx + r.w:
-                         pygame.draw.rect(surf, (255, 160, 0), (line_x, center_y - 2, 30, 4)) # Naranja retro
+                y = r.y + r.h // 2 - 2 - oy
+                lo = max(r.x, area.left - 30); hi = min(r.right, area.right)
+                surf.blits([(LANE_H_IMG, (line_x - ox, y))
+                            for line_x in range((lo // LANE_STEP + 1) * LANE_STEP, hi, LANE_STEP)], False)
             else: # Vertical
-                center_x = sx + r.w / 2
-                start_y = (cam.y % 60) - 60 
-                for i in range(int(HEIGHT / 60) + 2):
-                    line_y = 0 + i * 60 - start_y
-                    if sy < line_y < sy + r.h:
-                        pygame.draw.rect(surf, (255, 160, 0), (center_x - 2, line_y, 4, 30))
+                x = r.x + r.w // 2 - 2 - ox
+                lo = max(r.y, area.top - 30); hi = min(r.bottom, area.bottom)
+                surf.blits([(LANE_V_IMG, (x, line_y - oy))
+                            for line_y in range((lo // LANE_STEP + 1) * LANE_STEP, hi, LANE_STEP)], False)
         
         # 2. Draw Pavements (Aceras)
         for p in self.pavements:
-            sx,sy = cam.to_screen((p.x, p.y))
-            pygame.draw.rect(surf, PAVEMENT_COL, (sx, sy, p.w, p.h))
+            if not area.colliderect(p): continue
+            pygame.draw.rect(surf, PAVEMENT_COL, p.move(-ox, -oy))
             # Borde negro/oscuro para definir
-            pygame.draw.rect(surf, BLACK, (sx, sy, p.w, p.h), 1)
+            pygame.draw.rect(surf, BLACK, p.move(-ox, -oy), 1)
 
-        # 3. Draw Buildings (Estructuras Variadas con Efecto 3D)
-        shadow_depth = 4 # Profundidad de la sombra
-        
+        # 3. Draw Buildings (superficies pre-renderizadas, solo las indexadas en este trozo)
+        surf.blits([(b_data['img'], (b_data['rect'].x - ox, b_data['rect'].y - oy))
+                    for b_data in self.chunk_buildings.get((cx, cy), ())], False)
+        return surf
+
+    def build_chunk_index(self):
+        # Trozo -> edificios cuya superficie (rect + sombra) lo toca
+        index = defaultdict(list)
         for b_data in self.buildings:
             b = b_data['rect']
-            sx,sy = cam.to_screen((b.x,b.y))
-            
-            color = b_data['color']
-            darker_color = tuple(max(0, c - 20) for c in color)
-            lighter_color = tuple(min(255, c + 20) for c in color)
+            for cx in range(b.left // CHUNK_SIZE, (b.right + BUILDING_SHADOW - 1) // CHUNK_SIZE + 1):
+                for cy in range(b.top // CHUNK_SIZE, (b.bottom + BUILDING_SHADOW - 1) // CHUNK_SIZE + 1):
+                    index[(cx, cy)].append(b_data)
+        return index
 
-            # 3.1 Dibujar la Sombra (efecto 3D)
-            pygame.draw.rect(surf, darker_color, (sx + shadow_depth, sy + shadow_depth, b.w, b.h))
-            
-            # 3.2 Dibujar el Cuerpo Principal
-            pygame.draw.rect(surf, color, (sx,sy,b.w,b.h))
-            
-            # 3.3 Detalle de Fachada/Ventanas
-            window_color = WINDOW_LIGHT
-            
-            if b_data['type'] == 'office':
-                # Patrón de rejilla (ventanas de oficina)
-                window_size = 6; gap = 6
-                for wx in range(gap, b.w - gap, window_size + gap):
-                    for wy in range(gap, b.h - gap, window_size + gap):
-                        w_sx = sx + wx; w_sy = sy + wy
-                        pygame.draw.rect(surf, window_color, (w_sx, w_sy, window_size, window_size))
-            
-            elif b_data['type'] == 'shop':
-                # Fachada de tienda (una ventana grande)
-                pygame.draw.rect(surf, (150, 20, 20), (sx, sy, b.w, 8)) # Toldo/Techo rojo
-                pygame.draw.rect(surf, (50, 50, 50), (sx + 5, sy + 10, b.w - 10, b.h - 15)) # Ventana (oscura)
-                
-            else: # residence
-                # Patrón de ventanas pequeño y espaciado (residencial)
-                window_size = 4; gap = 12
-                for wx in range(gap, b.w - gap, window_size + gap):
-                    for wy in range(gap, b.h - gap, window_size + gap):
-                        w_sx = sx + wx; w_sy = sy + wy
-                        pygame.draw.rect(surf, window_color, (w_sx, w_sy, window_size, window_size))
-
-            # 3.4 Borde superior para efecto de luz
-            pygame.draw.rect(surf, lighter_color, (sx, sy, b.w, 1))
-            pygame.draw.rect(surf, lighter_color, (sx, sy, 1, b.h))
+    def render_minimap_bg(self, map_size):
+        # Fondo estático del minimapa (carreteras + edificios), se vuelca cada frame bajo lo dinámico
+        ratio = map_size / MAP_W
+        map_surf = pygame.Surface((map_size, map_size)).convert()
+        map_surf.fill(BLACK) # Fondo negro para el minimapa (estilo radar)
+        
+        # Roads (líneas grises muy delgadas)
+        for r in self.roads:
+            rx,ry,rw,rh = r.x * ratio, r.y * ratio, r.w * ratio, r.h * ratio
+            pygame.draw.rect(map_surf, (50, 50, 50), (rx, ry, rw, rh))
             
-            # 3.5 Borde negro final
-            pygame.draw.rect(surf, BLACK, (sx,sy,b.w,b.h), 1)
+        # Buildings (ligeramente más claros)
+        for b_data in self.buildings:
+            b = b_data['rect']
+            bx,by,bw,bh = b.x * ratio, b.y * ratio, b.w * ratio, b.h * ratio
+            color = tuple(min(255, c + 30) for c in b_data['color'])
+            pygame.draw.rect(map_surf, color, (bx, by, bw, bh))
+        return map_surf
+
+    def draw(self, surf, cam):
+        # Blit de los trozos visibles de la capa estática (renderizados la primera vez que se ven)
+        chunks = self.chunks
+        seq = []
+        for cy in range(cam.y // CHUNK_SIZE, (cam.y + HEIGHT - 1) // CHUNK_SIZE + 1):
+            for cx in range(cam.x // CHUNK_SIZE, (cam.x + WIDTH - 1) // CHUNK_SIZE + 1):
+                chunk = chunks.get((cx, cy))
+                if chunk is None:
+                    chunk = chunks[(cx, cy)] = self.render_chunk(cx, cy)
+                seq.append((chunk, (cx * CHUNK_SIZE - cam.x, cy * CHUNK_SIZE - cam.y)))
+        surf.blits(seq, False)
                 
-    def collides_building(self, rect):
+    def build_building_grid(self):
+        # Hash espacial estático: celda -> rects de los edificios que la tocan
+        grid = {}
         for b_data in self.buildings:
-            # Colisiona con el área del edificio, ignorando el efecto 3D
-            if rect.colliderect(b_data['rect']):
-                return True
+            b = b_data['rect']
+            for cx in range(b.left // BUILDING_CELL, (b.right - 1) // BUILDING_CELL + 1):
+                for cy in range(b.top // BUILDING_CELL, (b.bottom - 1) // BUILDING_CELL + 1):
+                    grid.setdefault((cx, cy), []).append(b)
+        return grid
+
+    def collides_building(self, rect):
+        # Solo se prueban los edificios de las celdas que toca rect, cada celda con
+        # un único collidelist (recorrido en C) (colisiona con el área del edificio, ignorando el efecto 3D)
+        grid = self.bgrid
+        x0 = rect.left // BUILDING_CELL; x1 = (rect.right - 1) // BUILDING_CELL
+        y0 = rect.top // BUILDING_CELL; y1 = (rect.bottom - 1) // BUILDING_CELL
+        if x0 == x1 and y0 == y1:
+            # Caso habitual: el rect (coche / peatón) cabe en una sola celda
+            cell = grid.get((x0, y0))
+            return cell is not None and rect.collidelist(cell) != -1
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = grid.get((cx, cy))
+                if cell and rect.collidelist(cell) != -1:
+                    return True
         return False
 
 # ------------------ Player ------------------
@@ -318,17 +601,18 @@ class Player:
         self.ammo_in_mag = [WEAPONS_DATA[0]["mag_size"], 0]
         self.ammo_total = [WEAPONS_DATA[0]["max_ammo"], WEAPONS_DATA[1]["max_ammo"]]
         
-        self.fire_cooldown = 0
+        self.fire_ready_at_ms = 0 # pygame.time.get_ticks() a partir del cual puede volver a disparar
         self.reload_timer = 0 
         self.money = 1000 
         self.alive = True
         self.image = PLAYER_IMG
-        self.rect = pygame.Rect(self.x - self.w//2, self.y - self.h//2, self.w, self.h)
+        self.rotations = PLAYER_ROT
+        self.rect = _Rect(self.x - self.w//2, self.y - self.h//2, self.w, self.h)
         
     def get_current_weapon_data(self):
         return WEAPONS_DATA[self.weapon]
     
-    def update(self, keys, dt):
+    def update(self, move, dt):
         if not self.alive: return
         
         if self.reload_timer > 0:
@@ -340,16 +624,11 @@ class Player:
         if self.in_vehicle:
             return
         
-        dx = dy = 0
-        if keys[pygame.K_w] or keys[pygame.K_UP]: dy -= 1
-        if keys[pygame.K_s] or keys[pygame.K_DOWN]: dy += 1
-        if keys[pygame.K_a] or keys[pygame.K_LEFT]: dx -= 1
-        if keys[pygame.K_d] or keys[pygame.K_RIGHT]: dx += 1
+        dx, dy = DIRS[move]
         if dx or dy:
-            l = math.hypot(dx,dy) or 1
-            nx = self.x + dx/l * self.speed
-            ny = self.y + dy/l * self.speed
-            new_rect = pygame.Rect(nx - self.w//2, ny - self.h//2, self.w, self.h)
+            nx = self.x + dx * self.speed
+            ny = self.y + dy * self.speed
+            new_rect = _Rect(nx - self.w//2, ny - self.h//2, self.w, self.h)
             if not GAME.world.collides_building(new_rect):
                 self.x = nx; self.y = ny
                 
@@ -420,14 +699,8 @@ class Player:
 
     def draw(self, surf, cam):
         if not self.alive: return
-        sx,sy = cam.to_screen((self.x - self.w//2, self.y - self.h//2))
-        try:
-            rotated = pygame.transform.rotate(self.image, -math.degrees(self.angle))
-            r = rotated.get_rect(center=(sx + self.w/2, sy + self.h/2))
-            surf.blit(rotated, r.topleft)
-        except:
-            # Fallback a un círculo simple con color de alto contraste
-            pygame.draw.circle(surf, HUD_TEXT_COLOR, (int(sx+self.w/2), int(sy+self.h/2)), int(self.w/2))
+        rotated, hw, hh = self.rotations[rot_index(self.angle)]
+        return surf.blit(rotated, (self.x - cam.x - hw, self.y - cam.y - hh))
     
     def enter_exit_vehicle(self):
         if not self.alive: return
@@ -445,8 +718,9 @@ class Player:
             if SND_ENTER: SND_ENTER.play()
             GAME.message("EXITED VEHICLE")
             return
-        for v in GAME.vehicles:
-            if not v.is_police and distance((self.x,self.y),(v.x,v.y)) < 60 and v.driver is None and v.health > 0 and not v.is_exploding:
+        for v in GAME.vehicles_near(self.x, self.y):
+            dx = self.x - v.x; dy = self.y - v.y
+            if not v.is_police and dx*dx + dy*dy < 60*60 and v.driver is None and v.health > 0 and not v.is_exploding:
                 v.driver = self
                 self.in_vehicle = v
                 if SND_ENTER: SND_ENTER.play()
@@ -463,8 +737,10 @@ class Player:
 # ------------------ Vehicle ------------------
 class Vehicle:
     # (Vehicle class remains the same)
+    hit_r = max(56, 36) / 2 + 8 # semilado de la caja de impacto de balas (w=56, h=36)
+
     def __init__(self,x,y,color=CAR_IMG.get_at((1,1)),is_police=False):
-        self.x=x; self.y=y
+        self.x=clamp(x, 0, MAP_W); self.y=clamp(y, 0, MAP_H)
         self.w=56; self.h=36
         self.angle=0
         self.speed=0
@@ -475,8 +751,11 @@ class Vehicle:
         self.is_police=is_police
         self.health=100
         self.image = CAR_IMG if not is_police else POLICE_IMG
+        self.rotations = CAR_ROT if not is_police else POLICE_ROT
         self.is_exploding = False 
         self.explosion_timer = 0
+        self.ai_bucket = random.randrange(AI_BUCKETS)
+        self.target_angle = 0
     
     def damage(self, amount):
         if self.health > 0:
@@ -495,95 +774,94 @@ class Vehicle:
                 elif self.driver and self.is_police:
                     self.driver = None
 
-    def update(self, dt, player=None, wanted=0):
+    def update(self, dt, move=0, player=None, wanted=0, chasing=False, ai_tick=True):
         if self.health <= 0:
             if self.is_exploding:
                 self.explosion_timer -= dt
                 if self.explosion_timer <= 0:
                     GAME.particles.add_explosion(self.x, self.y, 80, (255,100,0))
-                    if player and player.alive and distance((self.x,self.y), (player.x,player.y)) < 150:
+                    if player and player.alive and dist2(self.x, self.y, player.x, player.y) < 150*150:
                          player.health = max(0, player.health - 50)
                          GAME.message("EXPLOSION DAMAGE!")
-                    for npc in GAME.npcs:
-                         if npc.alive and distance((self.x,self.y), (npc.x,npc.y)) < 150:
-                             npc.damage(50)
+                    for npc in GAME.npcs_near(self.x, self.y, 150):
+                         npc.damage(50)
                     self.is_exploding = False
             return 
 
         if self.driver:
-            keys = pygame.key.get_pressed()
-            if keys[pygame.K_w]:
+            # move: máscara de movimiento calculada una vez por frame en Game.update
+            if move & UP_BIT:
                 self.speed = clamp(self.speed + self.accel, -self.max_speed/2, self.max_speed)
-            elif keys[pygame.K_s]:
+            elif move & DOWN_BIT:
                 self.speed = clamp(self.speed - self.brake, -self.max_speed/2, self.max_speed)
             else:
                 self.speed *= 0.96
                 if abs(self.speed) < 0.01: self.speed = 0
-            if keys[pygame.K_a]:
+            if move & LEFT_BIT:
                 self.angle -= self.turn_speed * (self.speed / max(0.1,self.max_speed)) * dt * 60
-            if keys[pygame.K_d]:
+            if move & RIGHT_BIT:
                 self.angle += self.turn_speed * (self.speed / max(0.1,self.max_speed)) * dt * 60
         else:
-            if self.is_police and wanted>0 and player and player.alive and distance((self.x,self.y), (player.x,player.y)) < 800:
-                dx = player.x - self.x; dy = player.y - self.y
-                d = math.hypot(dx,dy) or 1
-                ang = math.atan2(dy, dx)
-                diff = ((ang - self.angle + math.pi) % (2*math.pi)) - math.pi
+            if chasing:
+                # Rumbo hacia el jugador recalculado solo en el frame de su bucket
+                if ai_tick:
+                    self.target_angle = _atan2(player.y - self.y, player.x - self.x)
+                diff = ((self.target_angle - self.angle + math.pi) % (2*math.pi)) - math.pi
                 self.angle += clamp(diff, -0.05, 0.05)
                 self.speed = clamp(self.speed + 0.06, -self.max_speed/2, self.max_speed)
             else:
                 if random.random() < 0.002: self.angle += random.uniform(-0.4,0.4)
                 self.speed *= 0.995
+                if abs(self.speed) < 0.01: self.speed = 0
         
-        self.x += math.cos(self.angle) * self.speed
-        self.y += math.sin(self.angle) * self.speed
-        
-        rect = pygame.Rect(self.x - self.w/2, self.y - self.h/2, self.w, self.h)
-        if GAME.world.collides_building(rect):
-            self.x -= math.cos(self.angle) * self.speed * 2
-            self.y -= math.sin(self.angle) * self.speed * 2
-            self.speed = 0
-            if abs(self.speed) > 2.0:
-                 self.damage(5)
-
-        self.x = clamp(self.x, 0, MAP_W); self.y = clamp(self.y, 0, MAP_H)
-
-    def draw(self, surf, cam):
-        sx,sy = cam.to_screen((self.x - self.w/2, self.y - self.h/2))
-        
-        current_image = self.image
-        if self.health < 50:
-            damage_surf = pygame.Surface((self.w, self.h), pygame.SRCALPHA)
-            alpha = 200 - self.health * 2 
-            damage_surf.fill((255, 0, 0, clamp(alpha, 0, 200))) 
+        # Coches parados (la mayoría del tráfico aparcado): sin integración ni colisión
+        if self.speed:
+            a = int(self.angle * TRIG_SCALE) & TRIG_MASK
+            step_x = COS_LUT[a] * self.speed; step_y = SIN_LUT[a] * self.speed
+            self.x += step_x
+            self.y += step_y
             
-            temp_img = current_image.copy()
-            temp_img.blit(damage_surf, (0, 0))
-            current_image = temp_img
+            rect = _Rect(self.x - self.w/2, self.y - self.h/2, self.w, self.h)
+            if GAME.world.collides_building(rect):
+                self.x -= step_x * 2
+                self.y -= step_y * 2
+                self.speed = 0
+                if abs(self.speed) > 2.0:
+                     self.damage(5)
+
+            # Solo un coche que se ha movido puede salirse del mapa (se nace ya dentro)
+            x = self.x; y = self.y
+            self.x = 0 if x < 0 else MAP_W if x > MAP_W else x
+            self.y = 0 if y < 0 else MAP_H if y > MAP_H else y
+
+    def sprite(self, cam):
+        # (superficie, destino) listo para Surface.blits
+        idx = rot_index(self.angle)
+        if self.health < 50:
+            # Coche dañado: tinte rojo según la salud, de la cache compartida
+            rotated, hw, hh = damaged_frame(self.image, (self.w, self.h), self.health, idx)
+        else:
+            rotated, hw, hh = self.rotations[idx]
+        return rotated, (self.x - cam.x - hw, self.y - cam.y - hh)
 
-        if self.health > 0:
-            try:
-                rotated = pygame.transform.rotate(current_image, -math.degrees(self.angle))
-                r = rotated.get_rect(center=(sx + self.w/2, sy + self.h/2))
-                surf.blit(rotated, r.topleft)
-            except:
-                s = pygame.Surface((self.w,self.h), pygame.SRCALPHA)
-                pygame.draw.rect(s, self.color, (0,0,self.w,self.h))
-                surf.blit(s, (sx,sy))
+    def explosion_sprite(self, cam):
+        # (superficie, destino) de la explosión, para Surface.blits
+        sx,sy = cam.to_screen((self.x - self.w/2, self.y - self.h/2))
+        explosion_scale = 1.0 + (1.0 - self.explosion_timer) * 2
+        exp_w = int(EXPLOSION_IMG.get_width() * explosion_scale)
+        exp_h = int(EXPLOSION_IMG.get_height() * explosion_scale)
+        exp_img = pygame.transform.scale(EXPLOSION_IMG, (exp_w, exp_h))
         
-        if self.is_exploding:
-            explosion_scale = 1.0 + (1.0 - self.explosion_timer) * 2
-            exp_w = int(EXPLOSION_IMG.get_width() * explosion_scale)
-            exp_h = int(EXPLOSION_IMG.get_height() * explosion_scale)
-            exp_img = pygame.transform.scale(EXPLOSION_IMG, (exp_w, exp_h))
-            
-            exp_sx = int(sx + self.w/2 - exp_w/2)
-            exp_sy = int(sy + self.h/2 - exp_h/2)
-            surf.blit(exp_img, (exp_sx, exp_sy))
+        exp_sx = int(sx + self.w/2 - exp_w/2)
+        exp_sy = int(sy + self.h/2 - exp_h/2)
+        return exp_img, (exp_sx, exp_sy)
             
             
 # ------------------ NPC (peatones / policía a pie) ------------------
 class NPC:
+    # Atributos fijos: instancias compactas y acceso más rápido en step_npcs
+    __slots__ = ('x', 'y', 'w', 'h', 'police', 'alive', 'health', 'vx', 'vy', 'speed', 'image', 'ai_bucket')
+
     def __init__(self,x,y,police=False):
         self.x=x; self.y=y
         self.w=14; self.h=18
@@ -592,6 +870,8 @@ class NPC:
         self.health = 100
         self.vx=random.uniform(-1.2,1.2); self.vy=random.uniform(-1.2,1.2)
         self.speed = 1.2 if not police else 1.6
+        self.image = NPC_POLICE_IMG if police else NPC_IMG
+        self.ai_bucket = random.randrange(AI_BUCKETS)
     
     def damage(self, amount):
         if self.health > 0:
@@ -602,55 +882,117 @@ class NPC:
                     GAME.player.money += 15
                     GAME.wanted = clamp(GAME.wanted + 0.02, 0, MAX_WANTED) 
                     if SND_WANTED: SND_WANTED.play()
+                else:
+                    GAME.police_count -= 1
 
-    def update(self, dt, player=None, wanted=0):
-        if not self.alive: return
-        if self.police and wanted>0 and player and player.alive:
-            dx = player.x - self.x; dy = player.y - self.y
-            d = math.hypot(dx,dy) or 1
-            self.vx = (dx/d) * self.speed * (1 + wanted*0.1); self.vy = (dy/d) * self.speed * (1 + wanted*0.1)
-            if distance((self.x, self.y), (player.x, player.y)) < 30 and player.in_vehicle is None:
+    def health_bar_sprite(self, cam):
+        # Simple health bar for police: (superficie, destino) para Surface.blits
+        sx,sy = cam.to_screen((self.x - self.w/2, self.y - self.h/2))
+        return HEALTH_BAR_IMGS[int(self.w * (self.health / 100))], (sx, sy - 5)
+
+def step_npcs(npcs, player, wanted, collides, bucket=None):
+    # Paso de IA de todos los NPC en un solo bucle por frame, con los nombres
+    # calientes izados a locales en vez de una llamada a método por peatón.
+    # Con bucket, los NPC ociosos lejos del jugador solo se mueven en el frame de su bucket.
+    rand = random.random; uniform = random.uniform
+    sqrt = _sqrt; Rect = _Rect
+    x_max = MAP_W - 5; y_max = MAP_H - 5
+    chase = wanted > 0 and player is not None and player.alive
+    px, py = (player.x, player.y) if player is not None else (0, 0)
+    if chase:
+        chase_mult = 1 + wanted*0.1
+        on_foot = player.in_vehicle is None
+    for n in npcs:
+        if not n.alive: continue
+        if bucket is not None and not (chase and n.police):
+            dx = abs(n.x - px); dy = abs(n.y - py)
+            if (dx > ACTIVE_HALF_W or dy > ACTIVE_HALF_H) and (
+                    n.ai_bucket != bucket or dx > FREEZE_DIST or dy > FREEZE_DIST):
+                continue
+        speed = n.speed
+        if chase and n.police:
+            dx = px - n.x; dy = py - n.y
+            d2 = dx*dx + dy*dy
+            inv = speed * chase_mult / sqrt(d2) if d2 > 1e-6 else 0.0
+            n.vx = dx * inv; n.vy = dy * inv
+            if d2 < 30*30 and on_foot:
                 player.health = max(0, player.health - 0.5)
+        elif rand() < 0.02:
+            n.vx = uniform(-1.2,1.2); n.vy = uniform(-1.2,1.2)
+        nx = n.x + n.vx * speed
+        ny = n.y + n.vy * speed
+        if not collides(Rect(nx - n.w/2, ny - n.h/2, n.w, n.h)):
+            n.x = 5 if nx < 5 else x_max if nx > x_max else nx
+            n.y = 5 if ny < 5 else y_max if ny > y_max else ny
         else:
-            if random.random() < 0.02:
-                self.vx = random.uniform(-1.2,1.2); self.vy = random.uniform(-1.2,1.2)
-        nx = self.x + self.vx * self.speed
-        ny = self.y + self.vy * self.speed
-        rect = pygame.Rect(nx - self.w/2, ny - self.h/2, self.w, self.h)
-        if not GAME.world.collides_building(rect):
-            self.x = clamp(nx, 5, MAP_W-5); self.y = clamp(ny, 5, MAP_H-5)
-        else:
-            self.vx = -self.vx; self.vy = -self.vy
-            
-    def draw(self, surf, cam):
-        if not self.alive: return
-        sx,sy = cam.to_screen((self.x - self.w/2, self.y - self.h/2))
-        color = POLICE_COLOR if self.police else (255, 255, 50) # Peatones amarillos neón
-        pygame.draw.rect(surf, color, (sx,sy,self.w,self.h))
-        # Simple health bar for police
-        if self.police and self.health < 100:
-             bar_w = int(self.w * (self.health / 100))
-             pygame.draw.rect(surf, (200,50,50), (sx, sy - 5, self.w, 3))
-             pygame.draw.rect(surf, (50,200,50), (sx, sy - 5, bar_w, 3))
+            n.vx = -n.vx; n.vy = -n.vy
 
 # ------------------ Bullet ------------------
 class Bullet:
-    def __init__(self,x,y,angle,owner,speed=14,life=120,damage=30):
+    # Objeto compacto sin __dict__: la integración se hace en línea en Game.update
+    __slots__ = ('x', 'y', 'vx', 'vy', 'life', 'owner', 'damage')
+    image = BULLET_IMG # sprite compartido por todas las balas
+
+    def __init__(self,x=0,y=0,angle=0,owner=None,speed=14,life=120,damage=30):
+        self.reset(x, y, angle, owner, speed, life, damage)
+
+    def reset(self,x,y,angle,owner,speed=14,life=120,damage=30):
+        # Reinicializa una bala reciclada del pool
         self.x=x; self.y=y
-        self.vx=math.cos(angle)*speed; self.vy=math.sin(angle)*speed
+        self.vx=_cos(angle)*speed; self.vy=_sin(angle)*speed
         self.life=life; self.owner=owner; self.damage=damage
-        self.image = BULLET_IMG
-    def update(self, dt):
-        self.x += self.vx; self.y += self.vy; self.life -= 1
-    def draw(self, surf, cam):
-        sx,sy = cam.to_screen((self.x - 4, self.y - 4))
-        try:
-            surf.blit(self.image, (sx,sy))
-        except:
-            pygame.draw.circle(surf, BULLET_IMG.get_at((1,1)), (int(sx+4), int(sy+4)), 3)
+        return self
+
+class BulletPool:
+    # Balas vivas (active) + lista libre de balas preasignadas para reciclar
+    def __init__(self, size=BULLET_POOL_SIZE):
+        self.active = []
+        self.free = [Bullet() for _ in range(size)]
+
+    def __iter__(self):
+        return iter(self.active)
+
+    def __len__(self):
+        return len(self.active)
+
+    def spawn(self, x, y, angle, owner, speed=14, life=120, damage=30):
+        free = self.free
+        b = free.pop().reset(x, y, angle, owner, speed, life, damage) if free else Bullet(x, y, angle, owner, speed, life, damage)
+        self.active.append(b)
+        return b
+
+    def sweep(self):
+        # Barrido único de las balas marcadas como muertas (life = 0) tras los impactos
+        alive = []; free = self.free
+        for b in self.active:
+            if b.life > 0:
+                alive.append(b)
+            else:
+                free.append(b)
+        self.active = alive
+
+    def sprites(self, x0, y0, x1, y1, cx, cy):
+        # (superficie, destino) de las balas dentro de (x0, y0)-(x1, y1), listo para Surface.blits
+        img = Bullet.image
+        return [(img, (b.x - 4 - cx, b.y - 4 - cy)) for b in self.active
+                if x0 <= b.x <= x1 and y0 <= b.y <= y1]
+
+    def step(self):
+        # Integra todas las balas y descarta en una pasada las de vida agotada o fuera del mapa
+        alive = []; free = self.free
+        for b in self.active:
+            b.x += b.vx; b.y += b.vy; b.life -= 1
+            if b.life > 0 and 0 <= b.x <= MAP_W and 0 <= b.y <= MAP_H:
+                alive.append(b)
+            else:
+                free.append(b)
+        self.active = alive
 
 # ------------------ Partículas (para explosiones/golpes) ------------------
 class Particle:
+    # Sin __dict__; ParticleSystem.update integra todas en línea
+    __slots__ = ('x', 'y', 'color', 'size', 'lifetime', 'vx', 'vy')
+
     def __init__(self, x, y, color, size, lifetime, vx, vy):
         self.x, self.y = x, y
         self.color = color
@@ -658,13 +1000,17 @@ class Particle:
         self.lifetime = lifetime
         self.vx, self.vy = vx, vy
 
-    def update(self, dt):
-        self.x += self.vx; self.y += self.vy; self.lifetime -= dt
-        self.size = max(0, self.size - 0.1 * dt)
+# Círculos de partícula pre-renderizados por (color, radio), creados la primera vez que se piden
+PARTICLE_CACHE = {}
 
-    def draw(self, surf, cam):
-        sx, sy = cam.to_screen((self.x, self.y))
-        pygame.draw.circle(surf, self.color, (int(sx), int(sy)), int(self.size))
+def particle_image(color, r):
+    key = (color, r)
+    img = PARTICLE_CACHE.get(key)
+    if img is None:
+        img = pygame.Surface((2 * r, 2 * r), pygame.SRCALPHA)
+        pygame.draw.circle(img, color, (r, r), r)
+        img = PARTICLE_CACHE[key] = img.convert_alpha()
+    return img
 
 class ParticleSystem:
     def __init__(self):
@@ -672,21 +1018,36 @@ class ParticleSystem:
 
     def add_explosion(self, x, y, count, color):
         for _ in range(count):
-            angle = random.uniform(0, 2 * math.pi)
+            a = random.randrange(TRIG_STEPS)
             speed = random.uniform(2, 8)
-            vx = math.cos(angle) * speed
-            vy = math.sin(angle) * speed
+            vx = COS_LUT[a] * speed
+            vy = SIN_LUT[a] * speed
             p = Particle(x, y, color, random.uniform(3, 8), random.uniform(0.5, 1.5), vx, vy)
             self.particles.append(p)
 
     def update(self, dt):
-        self.particles = [p for p in self.particles if p.lifetime > 0 and p.size > 0]
+        # Una pasada: descarta las agotadas e integra las vivas, sin llamada a método por partícula
+        shrink = 0.1 * dt
+        alive = []
         for p in self.particles:
-            p.update(dt)
+            if p.lifetime > 0 and p.size > 0:
+                p.x += p.vx; p.y += p.vy; p.lifetime -= dt
+                size = p.size - shrink
+                p.size = size if size > 0 else 0
+                alive.append(p)
+        self.particles = alive
 
     def draw(self, surf, cam):
+        # Solo las partículas dentro de la vista (radio máximo 8 px), en un único blits
+        cx, cy = cam.x, cam.y
+        x0, y0 = cx - 8, cy - 8
+        x1, y1 = cx + WIDTH + 8, cy + HEIGHT + 8
+        seq = []
         for p in self.particles:
-            p.draw(surf, cam)
+            r = int(p.size)
+            if r > 0 and x0 <= p.x <= x1 and y0 <= p.y <= y1:
+                seq.append((particle_image(p.color, r), (int(p.x - cx) - r, int(p.y - cy) - r)))
+        return surf.blits(seq)
 
 # ------------------ Mission ------------------
 class Mission:
@@ -707,7 +1068,7 @@ class Mission:
             self.active = False; self.target = None
             return
         
-        if GAME.player.in_vehicle == self.target and distance((GAME.player.x,GAME.player.y), self.target_pos) < 50:
+        if GAME.player.in_vehicle == self.target and dist2(GAME.player.x, GAME.player.y, *self.target_pos) < 50*50:
             GAME.player.money += self.reward
             self.active = False; self.target = None
             GAME.message(f"MISSION COMPLETE! ${self.reward}")
@@ -729,18 +1090,84 @@ class Game:
             x=random.randint(20,MAP_W-20); y=random.randint(20,MAP_H-20); self.npcs.append(NPC(x,y, police=False))
         for _ in range(NUM_POLICE_PEOPLE):
             x=random.randint(20,MAP_W-20); y=random.randint(20,MAP_H-20); self.npcs.append(NPC(x,y, police=True))
+        self.police_count = NUM_POLICE_PEOPLE # policías a pie vivos (evita recorrer self.npcs cada frame)
             
-        self.bullets = []
+        self.bullets = BulletPool()
         self.wanted = 0
         self.minimap = True
         self.mission = Mission()
         self.message_queue = deque()
-        self.last_reinforce = time.time()
+        self.msg_clock = 0.0 # segundos de juego acumulados, para caducar mensajes
+        self.next_msg_expiry = float('inf') # caducidad más próxima de la cola
+        self.messages_dirty = True
+        self.hud_msg_surf = None; self.hud_msg_pos = (0, 0)
         self.time = 0.0 
+        self.last_reinforce = self.time
+        self.frame_counter = 0
         self.particles = ParticleSystem()
+        self.vehicle_grid = defaultdict(list)
+        self.rebuild_vehicle_grid()
+        self.npc_grid = None # rejilla de npcs_near; se anula al empezar cada update y se crea bajo demanda
+        self._last_view_key = None
+        self._aim_angle = 0.0 # ángulo jugador -> ratón, calculado en cada update y reutilizado por fire
+        self._prev_chasers = set() # perseguidores del frame anterior (para fijar el rumbo al empezar)
+        self._last_dirty = []
+        # Radios enteros del pulso del objetivo (mundo, minimapa), calculados una vez por frame en update
+        self._mission_pulse_world = 25; self._mission_pulse_mm = 5
+        self._mini_surf = pygame.Surface((MINIMAP_SIZE, MINIMAP_SIZE)).convert() # lienzo del minimapa, reutilizado
+        self._dark_overlay = pygame.Surface((WIDTH, HEIGHT)).convert() # capa de noche: negro opaco + set_alpha
+        self._dark_overlay.fill(BLACK)
+        self._money_label = (None, None) # (dinero, superficie): el rótulo solo se rehace si cambia
         
+    def rebuild_vehicle_grid(self):
+        grid = self.vehicle_grid
+        grid.clear()
+        for v in self.vehicles:
+            grid[(int(v.x) >> GRID_SHIFT, int(v.y) >> GRID_SHIFT)].append(v)
+
+    def vehicles_near(self, x, y):
+        # Vehículos en la celda de (x, y) y sus 8 vecinas
+        cx = int(x) >> GRID_SHIFT; cy = int(y) >> GRID_SHIFT
+        grid = self.vehicle_grid
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                cell = grid.get((gx, gy))
+                if cell:
+                    yield from cell
+
+    def query_range(self, x0, y0, x1, y1):
+        # Vehículos cuyo centro cae dentro del AABB (x0, y0)-(x1, y1)
+        grid = self.vehicle_grid
+        for gx in range(int(x0) >> GRID_SHIFT, (int(x1) >> GRID_SHIFT) + 1):
+            for gy in range(int(y0) >> GRID_SHIFT, (int(y1) >> GRID_SHIFT) + 1):
+                cell = grid.get((gx, gy))
+                if cell:
+                    for v in cell:
+                        if x0 <= v.x <= x1 and y0 <= v.y <= y1:
+                            yield v
+
+    def npcs_near(self, x, y, r):
+        # NPC vivos a menos de r de (x, y); candidatos de npc_grid. Un NPC puede estar en
+        # varias celdas: el dict (ordenado, O(1) por consulta) elimina los duplicados
+        found = {}
+        r2 = r * r
+        grid = self.npc_grid
+        if grid is None:
+            grid = self.npc_grid = build_hit_grid(self.npcs, 12)
+        for gx in range(int(x - r) >> GRID_SHIFT, (int(x + r) >> GRID_SHIFT) + 1):
+            for gy in range(int(y - r) >> GRID_SHIFT, (int(y + r) >> GRID_SHIFT) + 1):
+                for n in grid.get((gx, gy), ()):
+                    dx = n.x - x; dy = n.y - y
+                    if n.alive and dx*dx + dy*dy < r2:
+                        found[n] = None
+        return list(found)
+
     def message(self, txt, ttl=3.0):
-        self.message_queue.appendleft([txt, ttl])
+        # Se guarda la superficie ya renderizada junto al texto: [txt, instante de caducidad, surf]
+        expiry = self.msg_clock + ttl
+        self.message_queue.appendleft([txt, expiry, render_text(FONT, txt, HUD_TEXT_COLOR)])
+        self.next_msg_expiry = min(self.next_msg_expiry, expiry)
+        self.messages_dirty = True
     
     def save(self, filename="savegame.json"):
         # (Save/Load methods remain the same)
@@ -754,7 +1181,7 @@ class Game:
             'wanted': self.wanted
         }
         try:
-            with open(filename,'w') as f: json.dump(data,f)
+            Path(filename).write_bytes(json_dumps(data))
             self.message("GAME SAVED")
         except Exception as e:
             self.message(f"SAVE FAILED: {e}")
@@ -762,7 +1189,7 @@ class Game:
     def load(self, filename="savegame.json"):
         if not os.path.exists(filename): self.message("NO SAVE FILE"); return
         try:
-            with open(filename,'r') as f: data=json.load(f)
+            data = json_loads(Path(filename).read_bytes())
             p=data.get('player',{})
             self.player.x = p.get('x', self.player.x); self.player.y = p.get('y', self.player.y)
             self.player.health = p.get('health', self.player.health); self.player.money = p.get('money', self.player.money)
@@ -779,7 +1206,8 @@ class Game:
     
     def fire(self):
         if not self.player.alive or self.player.in_vehicle: return
-        if self.player.fire_cooldown > 0 or self.player.reload_timer > 0: return
+        now = pygame.time.get_ticks()
+        if now < self.player.fire_ready_at_ms or self.player.reload_timer > 0: return
         
         w = self.player.weapon
         w_data = WEAPONS_DATA[w]
@@ -788,21 +1216,24 @@ class Game:
             self.message("OUT OF AMMO. PRESS R TO RELOAD.")
             return
             
-        mx,my = pygame.mouse.get_pos()
-        world_mouse = (mx + camera.x, my + camera.y)
-        ang = math.atan2(world_mouse[1] - self.player.y, world_mouse[0] - self.player.x)
+        # Ángulo del último update (fire corre antes que update: un frame de retraso,
+        # el mismo que ya muestra el sprite del jugador)
+        ang = self._aim_angle
+        px, py = self.player.x, self.player.y
+        # Boca del arma: cos/sin del ángulo de apuntado una sola vez (bala de pistola + fogonazo)
+        muzzle_x, muzzle_y = px + _cos(ang)*24, py + _sin(ang)*24
+        damage = w_data["damage"]; spawn = self.bullets.spawn
         
         if w == 0: # Pistol
-            b = Bullet(self.player.x + math.cos(ang)*24, self.player.y + math.sin(ang)*24, ang, 'player', speed=18, life=120, damage=w_data["damage"])
-            self.bullets.append(b); self.player.ammo_in_mag[w] -= 1; self.player.fire_cooldown = w_data["cooldown"]
+            spawn(muzzle_x, muzzle_y, ang, 'player', speed=BULLET_MAX_SPEED, life=120, damage=damage)
         else: # Shotgun
+            uniform = random.uniform
             for _ in range(6):
-                spread = random.uniform(-0.35,0.35); a = ang + spread
-                b = Bullet(self.player.x + math.cos(a)*24, self.player.y + math.sin(a)*24, a, 'player', speed=15, life=80, damage=w_data["damage"])
-                self.bullets.append(b)
-            self.player.ammo_in_mag[w] -= 1; self.player.fire_cooldown = w_data["cooldown"]
+                a = ang + uniform(-0.35,0.35)
+                spawn(px + _cos(a)*24, py + _sin(a)*24, a, 'player', speed=15, life=80, damage=damage)
+        self.player.ammo_in_mag[w] -= 1; self.player.fire_ready_at_ms = now + w_data["cooldown_ms"]
         
-        self.particles.add_explosion(self.player.x + math.cos(ang)*24, self.player.y + math.sin(ang)*24, 2, (100,100,100))
+        self.particles.add_explosion(muzzle_x, muzzle_y, 2, (100,100,100))
             
         if SND_SHOOT: SND_SHOOT.play()
         self.wanted = clamp(self.wanted + 0.02, 0, MAX_WANTED) 
@@ -811,126 +1242,195 @@ class Game:
     def try_enter_exit(self):
         self.player.enter_exit_vehicle()
 
+    def toggle_minimap(self):
+        self.minimap = not self.minimap
+
+    def respawn(self):
+        # Tras morir: carga la última partida o, si sigue muerto, empieza de cero
+        self.load() 
+        if not self.player.alive: 
+            self.__init__()
+            self.player.x = MAP_W//2; self.player.y = MAP_H//2
+            self.player.health = 100
+            self.player.alive = True
+
     def update(self, dt):
-        keys = pygame.key.get_pressed()
-        mx,my = pygame.mouse.get_pos()
-        world_mouse = (mx + camera.x, my + camera.y)
+        move = movement_mask(pygame.key.get_pressed())
         
         self.time += dt * 0.5 
+        pulse = _sin(self.time * 10)
+        self._mission_pulse_world = int(25 + pulse * 5); self._mission_pulse_mm = int(5 + pulse * 2)
+        self.frame_counter += 1
+        # Las explosiones (Vehicle.update) consultan npcs_near: rejilla del frame actual, no la anterior
+        self.npc_grid = None
 
         if self.player.alive:
-            self.player.fire_cooldown = max(0, self.player.fire_cooldown - dt)
+            # El apuntado se refresca siempre (también recargando) para que el primer
+            # disparo tras recargar vaya hacia el ratón; el sprite solo gira si no recarga
+            mx, my = pygame.mouse.get_pos()
+            self._aim_angle = _atan2(my + camera.y - self.player.y, mx + camera.x - self.player.x)
             if self.player.reload_timer <= 0:
-                self.player.angle = math.atan2(world_mouse[1] - self.player.y, world_mouse[0] - self.player.x)
+                self.player.angle = self._aim_angle
             
             if self.player.in_vehicle:
-                self.player.in_vehicle.update(dt, player=self.player, wanted=self.wanted)
+                self.player.in_vehicle.update(dt, move, player=self.player, wanted=self.wanted)
                 self.player.x, self.player.y = self.player.in_vehicle.x, self.player.in_vehicle.y
             else:
-                self.player.update(keys, dt)
+                self.player.update(move, dt)
         
         self.vehicles = [v for v in self.vehicles if v.health > 0 or v.is_exploding]
 
+        # Solo persiguen los coches de policía dentro del radio de 800 px del jugador
+        chasers = set()
+        prev_chasers = self._prev_chasers
+        if self.wanted > 0 and self.player.alive:
+            px, py = self.player.x, self.player.y
+            for v in self.query_range(px - 800, py - 800, px + 800, py + 800):
+                dx = px - v.x; dy = py - v.y
+                if v.is_police and dx*dx + dy*dy < 800*800:
+                    chasers.add(v)
+                    if v not in prev_chasers:
+                        # Recién entra en la persecución: rumbo fresco sin esperar a su bucket
+                        v.target_angle = _atan2(dy, dx)
+        self._prev_chasers = chasers
+
+        bucket = self.frame_counter % AI_BUCKETS
+        px, py = self.player.x, self.player.y
         for v in self.vehicles:
-            v.update(dt, player=self.player, wanted=self.wanted)
-        for n in self.npcs:
-            n.update(dt, player=self.player, wanted=self.wanted)
+            # LOD: coches ociosos lejos del jugador solo en el frame de su bucket; muy lejos, congelados
+            if v.health > 0 and v.driver is None and v not in chasers:
+                dx = abs(v.x - px); dy = abs(v.y - py)
+                if (dx > ACTIVE_HALF_W or dy > ACTIVE_HALF_H) and (
+                        v.ai_bucket != bucket or dx > FREEZE_DIST or dy > FREEZE_DIST):
+                    continue
+            v.update(dt, move, player=self.player, wanted=self.wanted, chasing=v in chasers, ai_tick=v.ai_bucket == bucket)
+        self.rebuild_vehicle_grid()
+        step_npcs(self.npcs, self.player, self.wanted, self.world.collides_building, bucket)
         
         self.npcs = [n for n in self.npcs if n.alive]
-        
-        for b in list(self.bullets):
-            b.update(dt)
-            if b.life <= 0 or b.x < 0 or b.x > MAP_W or b.y < 0 or b.y > MAP_H:
-                try: self.bullets.remove(b)
-                except: pass; continue
-            
+
+        self.bullets.step()
+        # Rejillas de impacto para las balas (cada bala consulta solo su celda);
+        # sin balas en vuelo no se construyen. Son locales (no self.npc_grid): sus cajas se
+        # amplían en BULLET_MAX_SPEED para que la celda del punto final contenga todo
+        # blanco que el tramo recorrido pueda tocar
+        if self.bullets:
+            npc_grid = build_hit_grid(self.npcs, 12 + BULLET_MAX_SPEED)
+            vehicle_hit_grid = build_hit_grid(self.vehicles, Vehicle.hit_r + BULLET_MAX_SPEED)
+        any_hit = False
+        for b in self.bullets:
             hit = False
-            for npc in self.npcs:
-                if npc.alive and abs(b.x - npc.x) < 12 and abs(b.y - npc.y) < 12:
+            bx, by = b.x, b.y; ox, oy = bx - b.vx, by - b.vy # posición al inicio del frame
+            cell = (int(bx) >> GRID_SHIFT, int(by) >> GRID_SHIFT)
+            for npc in npc_grid.get(cell, ()):
+                if npc.alive and segment_hits_box(ox, oy, bx, by, npc.x, npc.y, 12):
                     npc.damage(b.damage)
                     hit = True; break
             
             if not hit:
-                for v in self.vehicles:
-                    if v.health > 0 and abs(b.x - v.x) < max(v.w,v.h)/2 + 8 and abs(b.y - v.y) < max(v.w,v.h)/2 + 8:
+                for v in vehicle_hit_grid.get(cell, ()):
+                    if v.health > 0 and segment_hits_box(ox, oy, bx, by, v.x, v.y, v.hit_r):
                         v.damage(b.damage)
                         hit = True; break
             
             if hit:
                 self.particles.add_explosion(b.x, b.y, 5, (200, 200, 200))
-                try: self.bullets.remove(b)
-                except: pass
+                b.life = 0 # marcada; se retira en el barrido
+                any_hit = True
+        if any_hit:
+            self.bullets.sweep()
 
-        if self.wanted > 0 and self.player.in_vehicle is None and not any(n.police for n in self.npcs):
+        if self.wanted > 0 and self.player.in_vehicle is None and self.police_count == 0:
             self.wanted = max(0, self.wanted - dt * 0.1) 
             
-        if self.wanted >= 1 and time.time() - self.last_reinforce > 30 / self.wanted:
+        # self.time avanza a dt*0.5: 15/wanted equivale a los 30/wanted segundos de antes
+        if self.wanted >= 1 and self.time - self.last_reinforce > 15 / self.wanted:
             px,py = self.player.x, self.player.y
             sx,sy = px + random.uniform(500,1000) * random.choice([-1,1]), py + random.uniform(500,1000) * random.choice([-1,1])
             self.vehicles.append(Vehicle(sx, sy, is_police=True))
             self.npcs.append(NPC(sx+10, sy+10, police=True))
-            self.last_reinforce = time.time()
+            self.police_count += 1
+            self.last_reinforce = self.time
             self.message("POLICE REINFORCEMENTS ARRIVED")
         
-        self.message_queue = deque([[txt, ttl - dt] for txt, ttl in self.message_queue if ttl > 0])
+        # Mensajes: solo se filtra la cola cuando caduca alguno
+        self.msg_clock += dt
+        if self.msg_clock > self.next_msg_expiry:
+            now = self.msg_clock
+            self.message_queue = deque(m for m in self.message_queue if m[1] > now)
+            self.next_msg_expiry = min((m[1] for m in self.message_queue), default=float('inf'))
+            self.messages_dirty = True
         self.mission.update(dt)
         self.particles.update(dt)
         
         cam_target = self.player.in_vehicle if self.player.in_vehicle else self.player
-        camera.update(cam_target)
+        camera.update_entity(cam_target)
 
 
     def draw(self, surf):
+        """Dibuja el frame completo. Devuelve los rects sucios a presentar,
+        o None si hay que volcar la pantalla entera (cámara/oscuridad cambiaron)."""
         self.world.draw(surf, camera)
+        dirty = []
 
         if self.mission.active and self.mission.target_pos:
             sx, sy = camera.to_screen(self.mission.target_pos)
             # Objetivo de misión como un círculo amarillo neón parpadeante
-            pulse_radius = 25 + math.sin(self.time * 10) * 5
-            pygame.draw.circle(surf, HUD_TEXT_COLOR, (int(sx), int(sy)), int(pulse_radius), 5)
+            dirty.append(pygame.draw.circle(surf, HUD_TEXT_COLOR, (int(sx), int(sy)), self._mission_pulse_world, 5))
+
 
+        # Culling contra la vista de la cámara (AABB ampliada)
+        cx, cy = camera.x, camera.y
+        vx0, vy0 = cx - CULL_MARGIN, cy - CULL_MARGIN
+        vx1, vy1 = cx + WIDTH + CULL_MARGIN, cy + HEIGHT + CULL_MARGIN
 
-        for n in self.npcs:
-            n.draw(surf, camera)
+        visible_npcs = [n for n in self.npcs if n.alive and vx0 <= n.x <= vx1 and vy0 <= n.y <= vy1]
+        dirty += surf.blits([(n.image, (n.x - n.w/2 - cx, n.y - n.h/2 - cy)) for n in visible_npcs])
+        dirty += surf.blits([n.health_bar_sprite(camera) for n in visible_npcs if n.police and n.health < 100])
             
-        for v in self.vehicles:
-            v.draw(surf, camera)
+        # Vehículos: sprites pre-rotados en un solo blits; explosiones encima en otro
+        visible_vehicles = [v for v in self.vehicles if vx0 <= v.x <= vx1 and vy0 <= v.y <= vy1]
+        dirty += surf.blits([v.sprite(camera) for v in visible_vehicles if v.health > 0])
+        dirty += surf.blits([v.explosion_sprite(camera) for v in visible_vehicles if v.is_exploding])
 
         if self.player.in_vehicle is None:
-            self.player.draw(surf, camera)
+            r = self.player.draw(surf, camera)
+            if r: dirty.append(r)
             
-        for b in self.bullets:
-            b.draw(surf, camera)
+        # Balas: una sola llamada a blits en vez de un blit por bala
+        dirty += surf.blits(self.bullets.sprites(vx0, vy0, vx1, vy1, cx, cy))
 
-        self.particles.draw(surf, camera)
-        
-        # Oscurecimiento (se mantiene el efecto para ambientación)
-        day_time = (self.time % 24)
-        darkness = 0
-        if 18 <= day_time <= 24: darkness = int(180 * (day_time - 18) / 6) # Menos oscuro para contraste
-        elif 0 <= day_time <= 6: darkness = int(180 * (6 - day_time) / 6)
+        dirty += self.particles.draw(surf, camera)
         
-        darkness = clamp(darkness, 0, 180) 
+        # Oscurecimiento (se mantiene el efecto para ambientación), leído de la tabla por hora del día
+        darkness = DARKNESS_LUT[int(self.time % 24 * DARKNESS_STEPS)]
         
-        if darkness > 0:
-            dark_overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            dark_overlay.fill((0, 0, 0, darkness))
-            surf.blit(dark_overlay, (0, 0))
+        if darkness:
+            # Superficie preasignada; solo cambia su alpha de superficie (mismo resultado que la capa SRCALPHA)
+            self._dark_overlay.set_alpha(darkness)
+            surf.blit(self._dark_overlay, (0, 0))
 
-        self.draw_hud(surf)
+        dirty += self.draw_hud(surf)
         
         if self.minimap:
-            self.draw_minimap(surf)
+            dirty.append(self.draw_minimap(surf))
+
+        # Dirty rects: lo dibujado este frame + lo del anterior (para borrarlo)
+        view_key = (camera.x, camera.y, darkness, self.minimap)
+        full_redraw = view_key != self._last_view_key
+        self._last_view_key = view_key
+        to_update = None if full_redraw else dirty + self._last_dirty
+        self._last_dirty = dirty
+        return to_update
 
     def draw_hud(self, surf):
-        # Fondo para el HUD (barra negra)
-        pygame.draw.rect(surf, BLACK, (0, 0, WIDTH, 70))
+        # Fondo para el HUD (barra negra); devuelve los rects sucios del HUD
+        dirty = [pygame.draw.rect(surf, BLACK, (0, 0, WIDTH, 70))]
         pygame.draw.line(surf, (30,30,30), (0, 70), (WIDTH, 70), 2)
         
         # 1. Health Bar (Izquierda)
         health_color = HUD_WANTED_COLOR if self.player.health < 30 else HUD_MONEY_COLOR
-        health_txt = BIG.render("ARMOR", True, HUD_TEXT_COLOR)
-        surf.blit(health_txt, (10, 5))
+        surf.blit(HUD_LABELS["ARMOR"], (10, 5))
         
         # Barra de vida
         bar_w = 150
@@ -941,139 +1441,151 @@ class Game:
         # 2. Money & Wanted Level (Derecha)
         
         # Nivel de Búsqueda (Estrellas)
-        wanted_text = "WANTED LEVEL: " + ("*" * int(self.wanted))
-        wanted_txt = BIG.render(wanted_text, True, HUD_WANTED_COLOR)
+        wanted_txt = WANTED_LABELS[clamp(int(self.wanted), 0, MAX_WANTED)]
         surf.blit(wanted_txt, (WIDTH - wanted_txt.get_width() - 10, 5))
 
         # Dinero
-        money_txt = BIG.render(f"CREDIT: ${self.player.money:,.0f}", True, HUD_MONEY_COLOR)
+        money, money_txt = self._money_label
+        if money != self.player.money:
+            money = self.player.money
+            money_txt = render_text(BIG, f"CREDIT: ${money:,.0f}", HUD_MONEY_COLOR)
+            self._money_label = (money, money_txt)
         surf.blit(money_txt, (WIDTH - money_txt.get_width() - 10, 35))
 
         # 3. Weapon Info (Centro)
         w = self.player.weapon
-        w_data = WEAPONS_DATA[w]
         
         ammo_in_mag = self.player.ammo_in_mag[w]
         ammo_total = self.player.ammo_total[w]
         
-        weapon_text = w_data['name']
         ammo_text = f"{ammo_in_mag} / {ammo_total}"
 
-        weapon_surf = BIG.render(weapon_text, True, HUD_TEXT_COLOR)
-        ammo_surf = BIG.render(ammo_text, True, HUD_TEXT_COLOR)
+        weapon_surf = WEAPON_LABELS[w]
+        ammo_surf = render_text(BIG, ammo_text, HUD_TEXT_COLOR)
         
         center_x = WIDTH // 2
         surf.blit(weapon_surf, (center_x - weapon_surf.get_width() // 2, 5))
         surf.blit(ammo_surf, (center_x - ammo_surf.get_width() // 2, 35))
 
         if self.player.reload_timer > 0:
-            reload_txt = BIG.render("RELOADING", True, (255, 100, 0))
-            surf.blit(reload_txt, (center_x - reload_txt.get_width() // 2, 60))
+            reload_txt = HUD_LABELS["RELOADING"]
+            dirty.append(surf.blit(reload_txt, (center_x - reload_txt.get_width() // 2, 60)))
         
-        # 4. Messages (Parte inferior central)
-        for i, (txt, ttl) in enumerate(self.message_queue):
-            msg_surf = FONT.render(txt, True, HUD_TEXT_COLOR)
+        # 4. Messages (Parte inferior central), compuestos solo cuando cambia la cola
+        if self.messages_dirty:
+            self.compose_messages()
+        if self.hud_msg_surf:
+            dirty.append(surf.blit(self.hud_msg_surf, self.hud_msg_pos))
+        return dirty
+
+    def compose_messages(self):
+        self.messages_dirty = False
+        n = len(self.message_queue)
+        if not n:
+            self.hud_msg_surf = None
+            return
+        msgs = [m[2] for m in self.message_queue]
+        max_w = max(m.get_width() for m in msgs)
+        x0 = WIDTH // 2 - max_w // 2
+        y0 = HEIGHT - 30 - (n - 1) * 25
+        strip = pygame.Surface((max_w, (n - 1) * 25 + max(m.get_height() for m in msgs)), pygame.SRCALPHA).convert_alpha()
+        for i, msg_surf in enumerate(msgs):
             x_pos = WIDTH // 2 - msg_surf.get_width() // 2
             y_pos = HEIGHT - 30 - i * 25
-            surf.blit(msg_surf, (x_pos, y_pos))
+            strip.blit(msg_surf, (x_pos - x0, y_pos - y0))
+        self.hud_msg_surf = strip
+        self.hud_msg_pos = (x0, y0)
 
     def draw_minimap(self, surf):
-        map_size = 180; map_x = WIDTH - map_size - 10; map_y = HEIGHT - map_size - 10
-        ratio = map_size / MAP_W
-        
-        map_surf = pygame.Surface((map_size, map_size))
-        map_surf.fill(BLACK) # Fondo negro para el minimapa (estilo radar)
+        map_size = MINIMAP_SIZE; map_x = WIDTH - map_size - 10; map_y = HEIGHT - map_size - 10
+        ratio = MINIMAP_RATIO
         
-        # Roads (líneas grises muy delgadas)
-        for r in self.world.roads:
-            rx,ry,rw,rh = r.x * ratio, r.y * ratio, r.w * ratio, r.h * ratio
-            pygame.draw.rect(map_surf, (50, 50, 50), (rx, ry, rw, rh))
-            
-        # Buildings (ligeramente más claros)
-        for b_data in self.world.buildings:
-            b = b_data['rect']
-            bx,by,bw,bh = b.x * ratio, b.y * ratio, b.w * ratio, b.h * ratio
-            color = tuple(min(255, c + 30) for c in b_data['color'])
-            pygame.draw.rect(map_surf, color, (bx, by, bw, bh))
-
+        # Carreteras y edificios vienen del fondo estático (volcado sobre un lienzo
+        # preasignado, sin crear superficie por frame); solo se dibuja lo dinámico
+        map_surf = self._mini_surf
+        map_surf.blit(self.world.mini_bg, (0, 0))
 
         # Player (punto brillante)
         px, py = self.player.x * ratio, self.player.y * ratio
         pygame.draw.circle(map_surf, HUD_MONEY_COLOR, (int(px), int(py)), 3)
         
-        # NPCs (police in red)
-        for n in self.npcs:
-            nx, ny = n.x * ratio, n.y * ratio
-            color = HUD_WANTED_COLOR if n.police else HUD_TEXT_COLOR
-            pygame.draw.circle(map_surf, color, (int(nx), int(ny)), 2)
-            
-        # Vehicles (puntos)
+        # NPCs (police in red) y vehículos: marcadores pre-renderizados en un solo blits
+        marks = [(MINI_POLICE_DOT if n.police else MINI_NPC_DOT, (int(n.x * ratio) - 2, int(n.y * ratio) - 2))
+                 for n in self.npcs]
+        player = self.player
         for v in self.vehicles:
-            vx, vy = v.x * ratio, v.y * ratio
-            color = (0, 0, 255) if v.is_police else (255, 50, 50)
-            if v.driver == self.player: color = HUD_MONEY_COLOR 
-            pygame.draw.rect(map_surf, color, (int(vx-2), int(vy-2), 4, 4))
+            img = MINI_PLAYER_CAR_IMG if v.driver == player else MINI_POLICE_CAR_IMG if v.is_police else MINI_CAR_IMG
+            marks.append((img, (int(v.x * ratio - 2), int(v.y * ratio - 2))))
+        map_surf.blits(marks, False)
             
         # Target (green pulse)
         if self.mission.active and self.mission.target_pos:
             tx, ty = self.mission.target_pos[0] * ratio, self.mission.target_pos[1] * ratio
-            pulse_radius = 5 + math.sin(self.time * 10) * 2
-            pygame.draw.circle(map_surf, HUD_MONEY_COLOR, (int(tx), int(ty)), int(pulse_radius), 1)
+            pygame.draw.circle(map_surf, HUD_MONEY_COLOR, (int(tx), int(ty)), self._mission_pulse_mm, 1)
 
         # Draw map onto screen with a thick border (GTA 2 style)
-        pygame.draw.rect(surf, HUD_TEXT_COLOR, (map_x - 5, map_y - 5, map_size + 10, map_size + 10), 3)
         surf.blit(map_surf, (map_x, map_y))
+        return pygame.draw.rect(surf, HUD_TEXT_COLOR, (map_x - 5, map_y - 5, map_size + 10, map_size + 10), 3)
 
 
 # ------------------ Main Loop ------------------
-def handle_input():
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            return False
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            if event.button == 1: # Left click
-                GAME.fire()
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_f:
-                GAME.try_enter_exit()
-            elif event.key == pygame.K_s and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                GAME.save()
-            elif event.key == pygame.K_l and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                GAME.load()
-            elif event.key == pygame.K_m:
-                GAME.minimap = not GAME.minimap
-            elif event.key == pygame.K_ESCAPE:
-                return False
-            elif event.key == pygame.K_p:
-                GAME.mission.start_steal()
-            elif event.key == pygame.K_r: # R for Reload
-                GAME.player.start_reload()
-            elif event.key == pygame.K_t: # T for Treatment/Heal
-                GAME.player.heal()
-            elif event.key == pygame.K_q: # Q for Switch Weapon
-                GAME.player.switch_weapon()
-            elif event.key == pygame.K_l and not GAME.player.alive:
-                GAME.load() 
-                if not GAME.player.alive: 
-                    GAME.__init__()
-                    GAME.player.x = MAP_W//2; GAME.player.y = MAP_H//2
-                    GAME.player.health = 100
-                    GAME.player.alive = True
-                
-    return True
+def make_key_actions(game):
+    # Despacho por diccionario en vez de la cadena if/elif por tecla.
+    # player/mission se resuelven al pulsar: respawn() los recrea.
+    get_mods = pygame.key.get_mods
+    def on_s():
+        if get_mods() & pygame.KMOD_CTRL: game.save()
+    def on_l():
+        if get_mods() & pygame.KMOD_CTRL: game.load()
+        elif not game.player.alive: game.respawn()
+    return {
+        pygame.K_f: game.try_enter_exit,
+        pygame.K_s: on_s,
+        pygame.K_l: on_l,
+        pygame.K_m: game.toggle_minimap,
+        pygame.K_p: lambda: game.mission.start_steal(),
+        pygame.K_r: lambda: game.player.start_reload(), # R for Reload
+        pygame.K_t: lambda: game.player.heal(), # T for Treatment/Heal
+        pygame.K_q: lambda: game.player.switch_weapon(), # Q for Switch Weapon
+    }
+
+def main_loop(game):
+    # Nombres calientes enlazados a locales: evita LOAD_GLOBAL + getattr en cada frame
+    event_get = pygame.event.get
+    tick = CLOCK.tick
+    flip = pygame.display.flip
+    update_rects = pygame.display.update
+    QUIT = pygame.QUIT; KEYDOWN = pygame.KEYDOWN; MOUSEBUTTONDOWN = pygame.MOUSEBUTTONDOWN
+    K_ESCAPE = pygame.K_ESCAPE
+    key_actions = make_key_actions(game)
+    screen = SCREEN
+
+    while True:
+        dt = tick(60) / 1000.0 
+        
+        for event in event_get():
+            etype = event.type
+            if etype == QUIT:
+                return
+            if etype == MOUSEBUTTONDOWN:
+                if event.button == 1: # Left click
+                    game.fire()
+            elif etype == KEYDOWN:
+                if event.key == K_ESCAPE:
+                    return
+                action = key_actions.get(event.key)
+                if action: action()
+        
+        game.update(dt)
+        dirty = game.draw(screen)
+        
+        if dirty is None:
+            flip()
+        else:
+            update_rects(dirty)
 
 GAME = Game()
-RUNNING = True
-while RUNNING:
-    DT = CLOCK.tick(60) / 1000.0 
-    
-    RUNNING = handle_input()
-    
-    if RUNNING:
-        GAME.update(DT)
-        GAME.draw(SCREEN)
-        
-        pygame.display.flip()
+main_loop(GAME)
 
 pygame.quit()
-sys.exit()
\ No newline at end of file
+sys.exit()